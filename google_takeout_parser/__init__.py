@@ -1,6 +1,18 @@
-import importlib.metadata
+from functools import lru_cache
+from typing import Any
 
-# Change here if project is renamed and does not equal the package name
-__version__ = importlib.metadata.version(__name__)
 
-del importlib
+@lru_cache(maxsize=None)
+def _version() -> str:
+    import importlib.metadata
+
+    # Change here if project is renamed and does not equal the package name
+    return importlib.metadata.version(__name__)
+
+
+# resolved lazily, importlib.metadata is slow to import and most of the CLI
+# (e.g. --help, cache_dir) never needs the version
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
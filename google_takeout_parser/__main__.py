@@ -1,8 +1,16 @@
 import os
-import json
+import sys
 from datetime import datetime, date
 import dataclasses
-from typing import List, Optional, Callable, Sequence, Any, Dict, Type, Tuple
+from typing import (
+    Optional,
+    Callable,
+    Sequence,
+    Iterable,
+    Any,
+    Dict,
+    Type,
+)
 
 import click
 
@@ -33,15 +41,10 @@ def main(verbose: Optional[bool]) -> None:
 
 
 # use the union of types to determine the possible filters
-from .models import DEFAULT_MODEL_TYPE, get_union_args
-
-model_types: Optional[Tuple[Type[DEFAULT_MODEL_TYPE]]] = get_union_args(
-    DEFAULT_MODEL_TYPE
-)
-assert model_types is not None
+from .models import DEFAULT_MODEL_TYPE, DEFAULT_MODEL_TYPES
 
 FILTER_OPTIONS: Dict[str, Type[DEFAULT_MODEL_TYPE]] = {
-    t.__name__: t for t in model_types
+    t.__name__: t for t in DEFAULT_MODEL_TYPES
 }
 
 from .locales.all import LOCALES
@@ -84,34 +87,109 @@ def shared_options(func: Callable[..., None]) -> Callable[..., None]:
     return func
 
 
-def _serialize_default(obj: Any) -> Any:
+def _serialize_exception(obj: Exception) -> Dict[str, str]:
+    return {"type": type(obj).__name__, "value": str(obj)}
+
+
+def _dataclass_serializer(cls: Type[Any]) -> Callable[[Any], Dict[str, Any]]:
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    assert "type" not in names
+    type_name = cls.__name__
+
+    def _serialize(obj: Any) -> Dict[str, Any]:
+        # shallow copy, unlike dataclasses.asdict this doesn't deepcopy every field
+        # the json encoder calls this again for any nested dataclasses
+        d = {name: getattr(obj, name) for name in names}
+        d["type"] = type_name
+        return d
+
+    return _serialize
+
+
+def _find_serializer(obj: Any) -> Callable[[Any], Any]:
     if isinstance(obj, Exception):
-        return {"type": type(obj).__name__, "value": str(obj)}
+        return _serialize_exception
     elif dataclasses.is_dataclass(obj):
-        d = dataclasses.asdict(obj)  # type: ignore[call-overload]  # see https://github.com/python/mypy/issues/17550
-        assert "type" not in d
-        d["type"] = type(obj).__name__
-        return d
+        return _dataclass_serializer(type(obj))
     elif isinstance(obj, datetime):
-        return str(obj)
+        return str
     elif isinstance(obj, date):
-        return str(obj)
+        return str
+    elif isinstance(obj, tuple):
+        # NamedTuples (e.g. Subtitles), the stdlib json module serializes these as lists
+        return list
     raise TypeError(f"No known way to serialize {type(obj)} '{obj}'")
 
 
-def _handle_action(res: List[Any], action: str) -> None:
+# there are only a few types which get serialized, so after the first few
+# events, finding how to serialize an object is a single dict lookup
+_SERIALIZERS: Dict[Type[Any], Callable[[Any], Any]] = {}
+
+
+def _serialize_default(obj: Any) -> Any:
+    serializer = _SERIALIZERS.get(type(obj))
+    if serializer is None:
+        serializer = _SERIALIZERS[type(obj)] = _find_serializer(obj)
+    return serializer(obj)
+
+
+def _json_dumps_func() -> Callable[[Any], bytes]:
+    try:
+        import orjson
+    except ModuleNotFoundError:
+        import json
+
+        # compact, and without escaping non-ASCII characters, like orjson
+        return lambda obj: json.dumps(
+            obj, default=_serialize_default, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
+    def _dumps(obj: Any) -> bytes:
+        # pass dataclasses/datetimes through to _serialize_default, so that the
+        # 'type' key is added, like it is for the stdlib json fallback
+        return orjson.dumps(
+            obj,
+            default=_serialize_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+    return _dumps
+
+
+def _emit_json(res: Iterable[Any]) -> None:
+    """
+    Write the results as a UTF-8 encoded JSON list, serializing one item at a
+    time so the entire output never has to be kept in memory
+
+    This writes bytes to the underlying buffer, so it works regardless of the
+    encoding of stdout (e.g. when redirected on Windows)
+    """
+    dumps = _json_dumps_func()
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    out.write(b"[")
+    for i, r in enumerate(res):
+        if i != 0:
+            out.write(b",")
+        out.write(dumps(r))
+    out.write(b"]\n")
+    out.flush()
+
+
+def _handle_action(res: Iterable[Any], action: str) -> None:
     if action == "repl":
         import IPython  # type: ignore[import]
 
+        res = list(res)
         click.echo(f"Interact with the export using {click.style('res', 'green')}")
         IPython.embed()  # type: ignore[no-untyped-call]
     elif action == "json":
-        click.echo(json.dumps(res, default=_serialize_default))
+        _emit_json(res)
     else:
         from collections import Counter
         from pprint import pformat
 
-        click.echo(pformat(Counter([type(t).__name__ for t in res])))
+        click.echo(pformat(Counter(type(t).__name__ for t in res)))
 
 
 @main.command(short_help="parse a takeout directory")
@@ -143,11 +221,11 @@ def parse(
             logger.warn(
                 "As it would otherwise re-compute every time, filtering happens after loading from cache"
             )
-        res = list(tp.parse(cache=True))
+        res = tp.parse(cache=True)
         if filter_:
-            res = [r for r in res if isinstance(r, filter_type)]
+            res = (r for r in res if isinstance(r, filter_type))
     else:
-        res = list(tp.parse(cache=False, filter_type=filter_type))
+        res = tp.parse(cache=False, filter_type=filter_type)
     _handle_action(res, action)
 
 
@@ -169,28 +247,24 @@ def merge(
     from .models import DEFAULT_MODEL_TYPE, Res
     from .log import logger
 
-    res: List[Res[DEFAULT_MODEL_TYPE]] = []
+    res: Iterable[Res[DEFAULT_MODEL_TYPE]]
     filter_type = tuple(FILTER_OPTIONS[ff] for ff in filter_)
     if cache:
         if filter_:
             logger.warn(
                 "As it would otherwise re-compute every time, filtering happens after loading from cache"
             )
-        res = list(cached_merge_takeouts(list(takeout_dir), locale_name=locale))
+        res = cached_merge_takeouts(list(takeout_dir), locale_name=locale)
         if filter_:
-            res = [r for r in res if isinstance(r, filter_type)]
+            res = (r for r in res if isinstance(r, filter_type))
     else:
-        res = list(
-            merge_events(
-                *iter(  # type: ignore
-                    [
-                        TakeoutParser(p, locale_name=locale).parse(
-                            cache=False,
-                            filter_type=filter_type,
-                        )
-                        for p in takeout_dir
-                    ]
+        res = merge_events(
+            *(  # type: ignore[arg-type]
+                TakeoutParser(p, locale_name=locale).parse(
+                    cache=False,
+                    filter_type=filter_type,
                 )
+                for p in takeout_dir
             )
         )
     _handle_action(res, action)
@@ -220,8 +294,9 @@ def cache_dir_remove() -> None:
 
     click.echo(str(takeout_cache_path))
     click.echo("Contents:")
-    for f in takeout_cache_path.rglob("*"):
-        print(f"\t{str(f)}")
+    for root, _, files in os.walk(takeout_cache_path):
+        for f in files:
+            print("\t" + os.path.join(root, f))
     if click.confirm("Really remove this directory?"):
         shutil.rmtree(str(takeout_cache_path))
 
@@ -251,8 +326,6 @@ def move(from_: str, to_dir: str, extract: bool) -> None:
     Utility command to help move/extract takeouts into the correct location
     """
     import time
-    import tempfile
-    import zipfile
 
     ts = int(time.time())
     target = f"{to_dir}/Takeout-{ts}"
@@ -261,18 +334,46 @@ def move(from_: str, to_dir: str, extract: bool) -> None:
         _safe_shutil_mv(from_, target)
     else:
         assert from_.endswith("zip")
-        zf = zipfile.ZipFile(from_)
-        with tempfile.TemporaryDirectory() as td:
-            click.echo(f"Extracting {from_} to {td}")
-            zf.extractall(path=td)
-            top_level = [f for f in os.listdir(td) if not f.startswith(".")]
-            if len(top_level) == 1 and top_level[0].lower().startswith("takeout"):
-                from_ = os.path.join(td, top_level[0])
-                _safe_shutil_mv(from_, target)
-            else:
-                raise RuntimeError(
-                    f"Expected top-level 'Takeout' folder in extracted folder, contents are {top_level}"
-                )
+        _extract_takeout(from_, target)
+
+
+def _extract_takeout(from_: str, to: str) -> None:
+    """
+    Extract the top-level 'Takeout' folder in the zipfile to a temporary
+    directory next to the target, then rename it into place. The rename is
+    cheap since it's on the same filesystem, and a failed extraction never
+    leaves a partial takeout at the target
+    """
+    import shutil
+    import tempfile
+    import zipfile
+
+    with zipfile.ZipFile(from_) as zf:
+        infos = zf.infolist()
+        top_level = sorted(
+            {
+                info.filename.split("/", 1)[0]
+                for info in infos
+                if not info.filename.startswith(".")
+            }
+        )
+        if not (len(top_level) == 1 and top_level[0].lower().startswith("takeout")):
+            raise RuntimeError(
+                f"Expected top-level 'Takeout' folder in zipfile, contents are {top_level}"
+            )
+
+        click.echo(f"Extracting {from_} to {to}")
+        assert not os.path.exists(to)
+        parent = os.path.dirname(os.path.abspath(to))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".extract-", dir=parent)
+        try:
+            # extractall sanitizes member names (absolute paths, '..', drive letters)
+            zf.extractall(tmp)
+            # the extracted folder has default permissions, unlike tmp itself
+            os.replace(os.path.join(tmp, top_level[0]), to)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
 
 
 def _safe_shutil_mv(from_: str, to: str) -> None:
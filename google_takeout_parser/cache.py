@@ -2,8 +2,18 @@
 Related to locating the default cache directory for this module
 """
 
+import os
+import sys
 from pathlib import Path
-from platformdirs import user_cache_dir
 
-cache_dir = user_cache_dir()  # handle portability issues/$HOME not being set
+if sys.platform.startswith("linux"):
+    # same as platformdirs on linux, inlined to avoid importing it on every run
+    cache_dir = os.environ.get("XDG_CACHE_HOME", "").strip() or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+else:
+    from platformdirs import user_cache_dir
+
+    cache_dir = user_cache_dir()  # handle portability issues/$HOME not being set
+
 takeout_cache_path = Path(cache_dir) / "google_takeout_parser"
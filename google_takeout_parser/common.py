@@ -2,6 +2,7 @@
 Result types, from https://github.com/karlicoss/HPI/blob/master/my/core/error.py
 """
 
+import os
 from typing import Union, TypeVar
 from pathlib import Path
 
@@ -13,3 +14,18 @@ ResT = Union[T, E]
 Res = ResT[T, Exception]
 
 PathIsh = Union[str, Path]
+
+
+def workers_from_env(name: str) -> int:
+    """
+    Number of worker processes to use, from the 'name' environment variable (0 if unset)
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(
+            f"{name} should be a number of worker processes, got {value!r}"
+        ) from None
@@ -1,5 +1,7 @@
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Callable, Iterator
+from typing import Dict, Optional, Callable, Iterator, List, Tuple, Pattern
 
 from ..models import BaseEvent, Res
 from ..parse_html.activity import _parse_html_activity  # noqa: F401
@@ -21,3 +23,208 @@ BaseResults = Iterator[Res[BaseEvent]]
 
 HandlerFunction = Callable[[Path], BaseResults]
 HandlerMap = Dict[str, Optional[HandlerFunction]]
+
+
+# characters which have a special meaning in a regex. If a pattern in a
+# HandlerMap doesn't contain any of these (unescaped), re.match is just a prefix check
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+class _PrefixTrieNode:
+    __slots__ = ("children", "prefixes", "regexes", "combined")
+
+    def __init__(self) -> None:
+        # full path component -> node for the next level
+        self.children: Dict[str, _PrefixTrieNode] = {}
+        # (start of the next path component, index in the handler map)
+        self.prefixes: List[Tuple[str, int]] = []
+        # regexes whose literal head passes through this node
+        self.regexes: List[Tuple[int, Pattern[str]]] = []
+        self.combined: Optional[Pattern[str]] = None
+
+    def match_regexes(self, path: str, best: Optional[int]) -> Optional[int]:
+        if self.combined is not None:
+            m = self.combined.match(path)
+            if m is not None:
+                assert m.lastgroup is not None
+                index = int(m.lastgroup[2:])
+                if best is None or index < best:
+                    return index
+            return best
+
+        for index, regex in self.regexes:
+            if best is not None and index > best:
+                break
+            if regex.match(path) is not None:
+                return index
+        return best
+
+
+class CompiledHandlerMap:
+    """
+    A HandlerMap preprocessed for matching lots of paths against it
+
+    Patterns are stored in a trie keyed by path component. Patterns without any
+    regex characters are literal prefixes (e.g. 'Google Photos/'), those are resolved
+    by walking the components of a path instead of trying every pattern. The other
+    patterns are attached to the node for the full components of their literal head
+    (e.g. 'My Activity/' for 'My Activity/Chrome/MyActivity.html'), and joined into one
+    regex per node, each pattern in its own named group. So a path only runs the
+    regexes whose literal head it starts with, with one call to .match per node
+
+    Like trying each pattern in order, the first pattern in the map which matches wins
+    """
+
+    def __init__(self, handler_map: HandlerMap) -> None:
+        self.handlers: List[Optional[HandlerFunction]] = []
+        # (literal start of the pattern, whether the whole pattern is that literal)
+        self.heads: List[Tuple[str, bool]] = []
+        self.root = _PrefixTrieNode()
+        regex_nodes: List[_PrefixTrieNode] = []
+        for index, (pattern, handler) in enumerate(handler_map.items()):
+            self.handlers.append(handler)
+            head, is_literal = _literal_head(pattern)
+            self.heads.append((head, is_literal))
+            *parts, last = head.split("/")
+            node = self.root
+            for part in parts:
+                node = node.children.setdefault(part, _PrefixTrieNode())
+            if is_literal:
+                node.prefixes.append((last, index))
+            else:
+                if not node.regexes:
+                    regex_nodes.append(node)
+                node.regexes.append((index, re.compile(pattern)))
+        for node in regex_nodes:
+            node.combined = self._combine_regexes(node.regexes)
+
+    @staticmethod
+    def _combine_regexes(
+        regexes: List[Tuple[int, Pattern[str]]]
+    ) -> Optional[Pattern[str]]:
+        """
+        Join the patterns into one alternation; the regex engine tries each alternative
+        in order, so the first one that matches is the first pattern in the map
+
+        Returns None if the patterns can't be safely joined (e.g. they use their own
+        named groups/backreferences, or inline flags), then they're tried one at a time
+        """
+        if len(regexes) == 0:
+            return None
+        if any(
+            regex.groupindex or re.search(r"\\\d", regex.pattern) is not None
+            for _, regex in regexes
+        ):
+            return None
+        try:
+            return re.compile(
+                "|".join(f"(?P<_h{index}>{regex.pattern})" for index, regex in regexes)
+            )
+        except re.error:
+            return None
+
+    def match(self, path: str) -> Optional[int]:
+        """
+        Returns the index (in self.handlers) of the first pattern which matches this
+        '/' separated path, or None if nothing matched
+        """
+        best: Optional[int] = None
+        node = self.root
+        for part in path.split("/"):
+            for prefix, index in node.prefixes:
+                if (best is None or index < best) and part.startswith(prefix):
+                    best = index
+            if node.regexes:
+                best = node.match_regexes(path, best)
+            next_node = node.children.get(part)
+            if next_node is None:
+                break
+            node = next_node
+        return best
+
+    def ignores_dir(self, directory: str) -> Optional[bool]:
+        """
+        Check whether files in this '/' separated directory (relative to the takeout)
+        can be skipped without matching them one by one. Returns:
+
+        True if every file below it matches an ignored (None) pattern, before any other
+        False if some file below it might be parsed or might not match anything
+        None if no pattern could match any file below it
+        """
+        prefix = directory + "/"
+        overlaps = False
+        for (head, is_literal), handler in zip(self.heads, self.handlers):
+            if is_literal and prefix.startswith(head):
+                # every path in this directory matches this pattern
+                return handler is None
+            if head.startswith(prefix) or prefix.startswith(head):
+                # some path in this directory might match this pattern
+                if handler is not None:
+                    return False
+                overlaps = True
+        return False if overlaps else None
+
+
+def _literal_head(pattern: str) -> Tuple[str, bool]:
+    """
+    Returns the literal text every match of this regex starts with, and whether
+    the pattern is entirely that literal (i.e. re.match is just a prefix check)
+
+    Escaped characters (e.g. '\\.' or '\\(') match themselves, so they're part of the literal
+    """
+    if _has_top_level_alternation(pattern):
+        return "", False
+    head: List[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            c = pattern[i + 1]
+            i += 2
+        elif _REGEX_META.match(c) is not None:
+            if c in "?*{" and head:
+                # the previous character is optional
+                head.pop()
+            return "".join(head), False
+        else:
+            i += 1
+        head.append(c)
+    return "".join(head), True
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    escaped = False
+    in_class = False
+    for c in pattern:
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+    return False
+
+
+@lru_cache(maxsize=32)
+def _compile_handler_items(
+    items: Tuple[Tuple[str, Optional[HandlerFunction]], ...]
+) -> CompiledHandlerMap:
+    return CompiledHandlerMap(dict(items))
+
+
+def compile_handler_map(handler_map: HandlerMap) -> CompiledHandlerMap:
+    """
+    Returns a CompiledHandlerMap for this HandlerMap, reusing a previously
+    compiled one if the handler map has the same contents. This is called
+    for every locale when guessing the locale, and again for every TakeoutParser
+    """
+    return _compile_handler_items(tuple(handler_map.items()))
@@ -12,27 +12,27 @@ from .common import (
 
 HANDLER_MAP: HandlerMap = {
     # Chrome
-    r"Chrome/BrowserHistory.json": _parse_chrome_history,
+    r"Chrome/BrowserHistory\.json": _parse_chrome_history,
     r"Chrome": None,  # Ignore rest of Chrome stuff
-    r"Google Play Store/Installs.json": _parse_app_installs,
+    r"Google Play Store/Installs\.json": _parse_app_installs,
     r"Google Play Store/": None,  # ignore anything else in Play Store
     # optional space to handle pre-2017 data
-    r"Location History/Location( )?History.json": _parse_location_history,  # old path to Location History
-    r"Location History( \(Timeline\))?/Records.json": _parse_location_history,
-    r"Location History( \(Timeline\))?/Semantic Location History/.*/.*.json": _parse_semantic_location_history,
+    r"Location History/Location( )?History\.json": _parse_location_history,  # old path to Location History
+    r"Location History( \(Timeline\))?/Records\.json": _parse_location_history,
+    r"Location History( \(Timeline\))?/Semantic Location History/.*/.*\.json": _parse_semantic_location_history,
     r"Location History( \(Timeline\))?/": None,  # ignore anything else in Location History
     # Youtube
-    r"YouTube( und YouTube Music)?/Verlauf/.*?.html": _parse_html_activity,
-    r"YouTube( und YouTube Music)?/Verlauf/.*?.json": _parse_json_activity,
-    r"YouTube( und YouTube Music)?/Meine Kommentare/.*?.html": _parse_html_comment_file,
-    r"YouTube( und YouTube Music)?/meine-live-chat-nachrichten/.*?.html": _parse_html_comment_file,
-    r"YouTube( und YouTube Music)?/Playlists/Liked videos.json": _parse_likes,
+    r"YouTube( und YouTube Music)?/Verlauf/.*?\.html": _parse_html_activity,
+    r"YouTube( und YouTube Music)?/Verlauf/.*?\.json": _parse_json_activity,
+    r"YouTube( und YouTube Music)?/Meine Kommentare/.*?\.html": _parse_html_comment_file,
+    r"YouTube( und YouTube Music)?/meine-live-chat-nachrichten/.*?\.html": _parse_html_comment_file,
+    r"YouTube( und YouTube Music)?/Playlists/Liked videos\.json": _parse_likes,
     r"YouTube( und Youtube Music)?/*": None,  # ignore anything else in Youtube
     # Activities
     # parse html activity is intentionally not used here, its deprecated and for languages other
     # than english would require restructuring the html parsing significantly
-    r"Meine Aktivitäten/.*?Meine\s*Aktivitäten.html": None,
-    r"Meine Aktivitäten/.*?Meine\s*Aktivitäten.json": _parse_json_activity,
+    r"Meine Aktivitäten/.*?Meine\s*Aktivitäten\.html": None,
+    r"Meine Aktivitäten/.*?Meine\s*Aktivitäten\.json": _parse_json_activity,
     # Ignored Google Services
     r"Google Fit": None,
     r"Google Play-Spieldienste/": None,
@@ -49,7 +49,6 @@ HANDLER_MAP: HandlerMap = {
     r"Discover/": None,
     r"Google Kontakte/": None,
     r"Gmail/": None,
-    r"Google Shopping": None,
     r"Google Unternehmensprofil/": None,
     r"Google Fotos/": None,
     r"Gespeichert/": None,
@@ -68,5 +67,5 @@ HANDLER_MAP: HandlerMap = {
     r"Zugriffsprotokollaktivitäten/": None,
     r"Search Contributions/": None,
     r"Android-Gerätekonfigurationsdienst/": None,
-    r"Archiv_Übersicht.html": None,  # description of takeout, not that useful
+    r"Archiv_Übersicht\.html": None,  # description of takeout, not that useful
 }
@@ -47,10 +47,9 @@ def get_paths_for_functions(
     paths = set()
     for handler_map in LOCALES.values():
         for path, match_func in handler_map.items():
-            for function in funcs:
-                if function == match_func:
-                    # no need to use os.sep here since paths in handler map always use /
-                    paths.add(path.split("/")[0])
+            if match_func in funcs:
+                # no need to use os.sep here since paths in handler map always use /
+                paths.add(path.split("/", 1)[0])
 
     # sort to prevent behaviour changing based on avaiable locales
     return sorted(paths)
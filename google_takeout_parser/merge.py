@@ -2,16 +2,17 @@
 Helper module to remove duplicate events when combining takeouts
 """
 
-from itertools import chain
-from typing import Set, Tuple, List, Any, Optional, Type
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from typing import Any, Set, List, Optional, Tuple, Type
 
 
 from cachew import cachew
 
 from .log import logger
 from .cache import takeout_cache_path
-from .common import PathIsh
-from .models import BaseEvent, CacheResults
+from .common import PathIsh, Res, workers_from_env
+from .models import BaseEvent, CacheResults, DEFAULT_MODEL_TYPE
 from .path_dispatch import TakeoutParser
 
 # hmm -- feel there are too many usecases to support
@@ -45,7 +46,26 @@ def cached_merge_takeouts(
 
     takeout_paths would be:
     ['Takeout-1599315526', 'Takeout-1616796262', 'Takeout-1599728222']
+
+    Set GOOGLE_TAKEOUT_PARSER_MERGE_WORKERS to a number of processes to parse
+    the takeouts in parallel. Each worker parses a whole takeout into a list and
+    sends it back, so all of the events are held in memory before merging
     """
+    yield from _merge_takeouts(takeout_paths, locale_name)
+
+
+def _merge_takeouts(
+    takeout_paths: List[PathIsh], locale_name: Optional[str]
+) -> CacheResults:
+    workers = workers_from_env("GOOGLE_TAKEOUT_PARSER_MERGE_WORKERS")
+    if workers > 1 and len(takeout_paths) > 1:
+        # parse each takeout in its own process. each worker returns a list, so
+        # this holds all the events in memory before merging
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parsed = list(ex.map(_parse_takeout, takeout_paths, repeat(locale_name)))
+        yield from merge_events(*map(iter, parsed))
+        return
+
     itrs: List[CacheResults] = []
     for pth in takeout_paths:
         tk = TakeoutParser(pth, warn_exceptions=True, locale_name=locale_name)
@@ -55,27 +75,35 @@ def cached_merge_takeouts(
     yield from merge_events(*itrs)
 
 
+def _parse_takeout(
+    takeout_path: PathIsh, locale_name: Optional[str]
+) -> List[Res[DEFAULT_MODEL_TYPE]]:
+    tk = TakeoutParser(takeout_path, warn_exceptions=True, locale_name=locale_name)
+    return list(tk.parse(cache=True))  # type: ignore[arg-type]
+
+
 # TODO: need to make sure that differences in format (HTML/JSON) don't result in duplicate events
 def merge_events(*sources: CacheResults) -> CacheResults:
     """
     Given a bunch of iterators, merges takeout events together
     """
     emitted: GoogleEventSet = GoogleEventSet()
+    add_if_not_present = emitted.add_if_not_present
     count = 0
     for event in chain(*sources):
         count += 1
-        if isinstance(event, Exception):
+        # computes the key once, instead of once for 'in' and again for .add
+        if isinstance(event, Exception) or add_if_not_present(event):
             yield event
-            continue
-        if event in emitted:
-            continue
-        emitted.add(event)
-        yield event
     logger.debug(
         f"TakeoutParse merge: received {count} events, removed {count - len(emitted)} duplicates"
     )
 
 
+# the exact (type, key) tuple, so distinct events are never merged together.
+# a 64-bit digest (e.g. blake2b of the repr) would use less memory per event,
+# but is lossy and costs ~2.5us per event to compute, against ~0.3us to build
+# and hash the tuple
 Key = Tuple[Type[Any], Any]
 
 
@@ -107,8 +135,7 @@ class GoogleEventSet:
         Returns False if element already existed, True if it didn't and we added it.
         More efficient than checking membership and adding separately, since we only compute key once.
         """
-        key = _create_key(other)
-        if key in self.keys:
-            return False
-        self.keys.add(key)
-        return True
+        keys = self.keys
+        size = len(keys)
+        keys.add(_create_key(other))
+        return len(keys) != size
@@ -2,10 +2,13 @@
 Models for the data parsed by this module
 
 Each top-level dataclass here has a 'key' property
-which determines unique events while merging
+which determines unique events while merging. The key
+is computed once per event (converting the datetime to
+a timestamp isn't free) and then stored on the instance
 """
 
 from __future__ import annotations
+import sys
 from datetime import datetime
 from typing import (
     Optional,
@@ -18,8 +21,10 @@ from typing import (
     Dict,
     Protocol,
     NamedTuple,
+    get_args,
 )
 from dataclasses import dataclass
+from functools import cached_property
 
 from .common import Res
 
@@ -36,6 +41,14 @@ def get_union_args(cls: Any) -> Optional[Tuple[Type]]:  # type: ignore[type-arg]
     return args  # type: ignore
 
 
+def _intern_opt(s: Optional[str]) -> Optional[str]:
+    """
+    Intern strings which only have a few distinct values across all events
+    (e.g. device names, enum-like fields), so each event doesn't hold its own copy
+    """
+    return None if s is None else sys.intern(s)
+
+
 class Subtitles(NamedTuple):
     name: str
     url: Optional[Url]
@@ -71,6 +84,11 @@ class Activity(BaseEvent):
     locationInfos: List[LocationInfo]
     products: List[str]
 
+    def __post_init__(self) -> None:
+        # there are only a handful of distinct headers/products, share one string for each
+        self.header = sys.intern(self.header)
+        self.products = [sys.intern(p) for p in self.products]
+
     @property
     def dt(self) -> datetime:
         return self.time
@@ -79,7 +97,7 @@ class Activity(BaseEvent):
     def products_desc(self) -> str:
         return ", ".join(sorted(self.products))
 
-    @property
+    @cached_property
     def key(self) -> Tuple[str, str, int]:
         return self.header, self.title, int(self.time.timestamp())
 
@@ -94,7 +112,7 @@ class YoutubeComment(BaseEvent):
     dt: datetime
     urls: List[Url]
 
-    @property
+    @cached_property
     def key(self) -> int:
         return int(self.dt.timestamp())
 
@@ -109,6 +127,9 @@ class CSVYoutubeComment(BaseEvent):
     videoId: str
     contentJSON: str
 
+    def __post_init__(self) -> None:
+        self.channelId = sys.intern(self.channelId)
+
     @property
     def url(self) -> str:
         return f"https://www.youtube.com/watch?v={self.videoId}&lc={self.commentId}"
@@ -117,7 +138,7 @@ class CSVYoutubeComment(BaseEvent):
     def video_url(self) -> str:
         return f"https://www.youtube.com/watch?v={self.videoId}"
 
-    @property
+    @cached_property
     def key(self) -> int:
         return int(self.dt.timestamp())
 
@@ -139,6 +160,9 @@ class CSVYoutubeLiveChat(BaseEvent):
     videoId: str
     contentJSON: str
 
+    def __post_init__(self) -> None:
+        self.channelId = sys.intern(self.channelId)
+
     @property
     def url(self) -> str:
         return f"https://www.youtube.com/watch?v={self.videoId}&lc={self.liveChatId}"
@@ -147,7 +171,7 @@ class CSVYoutubeLiveChat(BaseEvent):
     def video_url(self) -> str:
         return f"https://www.youtube.com/watch?v={self.videoId}"
 
-    @property
+    @cached_property
     def key(self) -> int:
         return int(self.dt.timestamp())
 
@@ -159,7 +183,7 @@ class LikedYoutubeVideo(BaseEvent):
     link: str
     dt: datetime
 
-    @property
+    @cached_property
     def key(self) -> int:
         return int(self.dt.timestamp())
 
@@ -173,6 +197,11 @@ class PlayStoreAppInstall(BaseEvent):
     deviceCarrier: Optional[str]
     deviceManufacturer: Optional[str]
 
+    def __post_init__(self) -> None:
+        self.deviceName = _intern_opt(self.deviceName)
+        self.deviceCarrier = _intern_opt(self.deviceCarrier)
+        self.deviceManufacturer = _intern_opt(self.deviceManufacturer)
+
     # noticed that lastUpdateTime was more accurate timestamp for the dt field
     # since different installation events of the same app had pretty close firstInstallation times
     # but the lastUpdate time was always at a later timestamp so I assumed it was the installation event
@@ -180,7 +209,7 @@ class PlayStoreAppInstall(BaseEvent):
     def dt(self) -> datetime:
         return self.lastUpdateTime  # previously returned the firstInstallationTime
 
-    @property
+    @cached_property
     def key(self) -> int:
         return int(self.lastUpdateTime.timestamp())
 
@@ -194,7 +223,11 @@ class Location(BaseEvent):
     source: Optional[str]
     dt: datetime
 
-    @property
+    def __post_init__(self) -> None:
+        # e.g. WIFI, GPS, CELL
+        self.source = _intern_opt(self.source)
+
+    @cached_property
     def key(self) -> Tuple[float, float, Optional[float], int]:
         return self.lat, self.lng, self.accuracy, int(self.dt.timestamp())
 
@@ -262,11 +295,17 @@ class PlaceVisit(BaseEvent):
     editConfirmationStatus: Optional[str]  # missing in older (around 2014/15) history
     placeVisitImportance: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        self.placeConfidence = _intern_opt(self.placeConfidence)
+        self.placeVisitType = _intern_opt(self.placeVisitType)
+        self.editConfirmationStatus = _intern_opt(self.editConfirmationStatus)
+        self.placeVisitImportance = _intern_opt(self.placeVisitImportance)
+
     @property
     def dt(self) -> datetime:  # type: ignore[override]
         return self.startTime
 
-    @property
+    @cached_property
     def key(self) -> Tuple[float, float, int, Optional[float]]:
         return self.lat, self.lng, int(self.startTime.timestamp()), self.visitConfidence
 
@@ -278,7 +317,11 @@ class ChromeHistory(BaseEvent):
     dt: datetime
     pageTransition: Optional[str]
 
-    @property
+    def __post_init__(self) -> None:
+        # e.g. LINK, TYPED, RELOAD
+        self.pageTransition = _intern_opt(self.pageTransition)
+
+    @cached_property
     def key(self) -> Tuple[str, int]:
         return self.url, int(self.dt.timestamp())
 
@@ -297,4 +340,7 @@ DEFAULT_MODEL_TYPE = Union[
     PlaceVisit,
 ]
 
+# the types in DEFAULT_MODEL_TYPE, computed once
+DEFAULT_MODEL_TYPES: Tuple[Type[DEFAULT_MODEL_TYPE], ...] = get_args(DEFAULT_MODEL_TYPE)
+
 CacheResults = Iterator[Res[DEFAULT_MODEL_TYPE]]
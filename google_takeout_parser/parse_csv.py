@@ -1,25 +1,41 @@
 import csv
 import json
-import io
 from pathlib import Path
-from typing import List, TextIO, Iterator, Literal, Union, Any, Dict
+from operator import itemgetter
+from typing import List, TextIO, Iterator, Literal, Union, Any, Dict, Tuple
 
 from .models import CSVYoutubeComment, CSVYoutubeLiveChat
 from .common import Res
 from .time_utils import parse_json_utc_date
 
 
-def _parse_youtube_comment_row(row: Dict[str, Any]) -> Res[CSVYoutubeComment]:
-    try:
-        comment_id = row['Comment ID']
-        channel_id = row['Channel ID']
-        created_at = row['Comment Create Timestamp']
-        price = row['Price']
-        parent_comment_id = row['Parent Comment ID']
-        video_id = row['Video ID']
-        textJSON = row['Comment Text']
-    except KeyError as e:
-        return e
+# read the CSVs in larger chunks than the default 8KiB
+_READ_BUFFER = 1024 * 1024
+
+
+# the columns used from the comments CSV, the order of the columns
+# in the file has changed between export formats, so they're looked up by name
+_COMMENT_COLUMNS = (
+    "Comment ID",
+    "Channel ID",
+    "Comment Create Timestamp",
+    "Price",
+    "Parent Comment ID",
+    "Video ID",
+    "Comment Text",
+)
+
+
+def _parse_youtube_comment_row(row: Tuple[str, ...]) -> Res[CSVYoutubeComment]:
+    (
+        comment_id,
+        channel_id,
+        created_at,
+        price,
+        parent_comment_id,
+        video_id,
+        textJSON,
+    ) = row
     return CSVYoutubeComment(
         commentId=comment_id,
         channelId=channel_id,
@@ -35,22 +51,36 @@ def _parse_youtube_comment_row(row: Dict[str, Any]) -> Res[CSVYoutubeComment]:
 
 
 def is_empty_row(row: List[str]) -> bool:
-    if len(row) == 0:
-        return True
-    for item in row:
-        if item.strip():
-            return False
-    return True
+    # isspace doesn't allocate a new string like strip would
+    return not any(item and not item.isspace() for item in row)
 
 
 def _parse_youtube_comments_buffer(buf: TextIO) -> Iterator[Res[CSVYoutubeComment]]:
-    reader = csv.DictReader(buf)
+    reader = csv.reader(buf)
+    header = next(reader, None)
+    if header is None:
+        return
+    # resolve the header once, instead of building a dict for each row
+    try:
+        get_columns = itemgetter(*(header.index(col) for col in _COMMENT_COLUMNS))
+    except ValueError as e:
+        yield e
+        return
+    # bind these locally, this loop runs once per comment
+    columns = len(header)
+    parse_row = _parse_youtube_comment_row
+    empty = is_empty_row
     for row in reader:
-        yield _parse_youtube_comment_row(row)
+        if empty(row):
+            continue
+        if len(row) != columns:
+            yield ValueError(f"Expected {columns} columns, got {len(row)}: {row}")
+            continue
+        yield parse_row(get_columns(row))
 
 
 def _parse_youtube_comments_csv(path: Path) -> Iterator[Res[CSVYoutubeComment]]:
-    with path.open("r", newline="") as f:
+    with path.open("r", newline="", encoding="utf-8", buffering=_READ_BUFFER) as f:
         yield from _parse_youtube_comments_buffer(f)
 
 
@@ -58,17 +88,15 @@ def _parse_youtube_comments_csv(path: Path) -> Iterator[Res[CSVYoutubeComment]]:
 
 
 def _parse_youtube_live_chat_row(row: List[str]) -> Res[CSVYoutubeLiveChat]:
-    try:
-        (
-            live_chat_id,
-            channel_id,
-            created_at,
-            price,
-            video_id,
-            textJSON,
-        ) = row
-    except ValueError as e:
-        return e
+    # the number of columns is checked by the caller
+    (
+        live_chat_id,
+        channel_id,
+        created_at,
+        price,
+        video_id,
+        textJSON,
+    ) = row
     return CSVYoutubeLiveChat(
         liveChatId=live_chat_id,
         channelId=channel_id,
@@ -86,39 +114,39 @@ def _parse_youtube_live_chats_buffer(
     reader = csv.reader(buf)
     if skip_first:
         next(reader)
+    parse_row = _parse_youtube_live_chat_row
+    empty = is_empty_row
     for row in reader:
-        if is_empty_row(row):
+        if empty(row):
             continue
         if len(row) != 6:
             yield ValueError(f"Expected 6 columns, got {len(row)}: {row}")
             continue
-        yield _parse_youtube_live_chat_row(row)
+        yield parse_row(row)
 
 
 def _parse_youtube_live_chats_csv(path: Path) -> Iterator[Res[CSVYoutubeLiveChat]]:
-    with path.open("r", newline="") as f:
+    with path.open("r", newline="", encoding="utf-8", buffering=_READ_BUFFER) as f:
         yield from _parse_youtube_live_chats_buffer(f)
 
 
 CSVOutputFormat = Literal["text", "markdown"]
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads  # type: ignore[assignment]
+
 
 def _validate_content(content: Union[str, Dict[Any, Any]]) -> Res[List[Dict[str, Any]]]:
     if isinstance(content, str) and content.startswith('{"text":"'):
         # new format (since 2024)
-        # this is a sequence of comma-separated serialized jsons...
-        json_end = '"}'
-        json_start = '{"'
-        split = content.split(json_end + "," + json_start)
-        segments = []
-        for i, js in enumerate(split):
-            if i != 0:
-                js = json_start + js
-            if i != len(split) - 1:
-                js = js + json_end
-            # we get \n as a result of csv parser... but json parser can't handle them!
-            js = js.replace('\n', '\\n')
-            segments.append(json.loads(js))
+        # this is a sequence of comma-separated serialized jsons, so wrapping it
+        # in brackets makes it a JSON list which can be parsed in one go
+        # we get \n as a result of csv parser... but json parser can't handle them!
+        segments: List[Dict[str, Any]] = _json_loads(
+            "[" + content.replace("\n", "\\n") + "]"
+        )
         return segments
     # old format
 
@@ -127,7 +155,7 @@ def _validate_content(content: Union[str, Dict[Any, Any]]) -> Res[List[Dict[str,
     else:
         if not isinstance(content, str):
             return ValueError(f"Expected str or dict, got {type(content)} {content}")  # type: ignore[unreachable]
-        data = json.loads(content)
+        data = _json_loads(content)
     if "takeoutSegments" not in data:
         return ValueError(f"Expected 'takeoutSegments' in content, got {data.keys()}")
 
@@ -145,26 +173,26 @@ def reconstruct_comment_content(
     if isinstance(takeout_segments, Exception):
         return takeout_segments
     if format == "text":
-        buf = io.StringIO()
-        for segment in takeout_segments:
-            if "text" in segment:
-                buf.write(segment["text"])
-        return buf.getvalue()
+        return "".join(
+            segment["text"] for segment in takeout_segments if "text" in segment
+        )
     elif format == "markdown":
-        buf = io.StringIO()
+        parts: List[str] = []
         for segment in takeout_segments:
-            if "link" in segment and "linkUrl" in segment["link"]:
+            link = segment.get("link")
+            if link is not None and "linkUrl" in link:
+                url = link["linkUrl"]
                 if "text" in segment:
-                    buf.write(f'[{segment["text"]}]({segment["link"]["linkUrl"]})')
+                    parts.append(f'[{segment["text"]}]({url})')
                 else:
-                    buf.write(segment["link"]["linkUrl"])
+                    parts.append(url)
             elif "text" in segment:
-                buf.write(segment["text"])
+                parts.append(segment["text"])
             else:
                 return ValueError(
                     f"Expected 'text' or 'link' in segment, got {segment}"
                 )
-        return buf.getvalue()
+        return "".join(parts)
     else:
         # this is not a user-facing error, its misconfiguration, so we raise it
         raise ValueError(f"Unknown format {format}")
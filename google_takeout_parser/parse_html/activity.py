@@ -2,9 +2,11 @@
 Parses the HTML MyActivity.html files that used to be the standard
 """
 
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import Any, List, Iterator, Optional, Tuple, Union, Dict, Iterable
+from functools import lru_cache
+from typing import List, Iterator, Optional, Tuple, Union, Iterable
 from urllib.parse import urlparse, parse_qs
 
 import bs4
@@ -39,12 +41,10 @@ def _group_by_brs(els: Iterable[PageElement]) -> ListOfTags:
     cur: List[TextOrEl]
     cur = []
     for tag in els:
-        if isinstance(tag, bs4.element.NavigableString):
+        # NavigableString is a str subclass, so this covers both
+        if isinstance(tag, str):
             cur.append(tag)
-        elif isinstance(tag, str):
-            cur.append(tag)
-        elif isinstance(tag, bs4.element.Tag):
-            # is a bs4.element.Tag
+        elif isinstance(tag, Tag):
             if tag.name == "br":
                 res.append(cur)
                 cur = []
@@ -78,15 +78,15 @@ def _parse_subtitles(
 
     for group in _group_by_brs(sub_children):
         # loop vars
-        buf: str = ""  # current text, till we hit a br (next group)
+        buf: List[str] = []  # current text, till we hit a br (next group)
         url: Optional[str] = None  # a URL, if this subtitle contains one
 
         for tag in group:
             if isinstance(tag, bs4.element.NavigableString):
-                buf += str(tag)
+                buf.append(tag)
             elif isinstance(tag, bs4.element.Tag):
                 if tag.name == "a":
-                    buf += str(tag.text)
+                    buf.append(tag.text)
                     if "href" in tag.attrs:
                         url = tag.attrs["href"]
                 else:
@@ -95,58 +95,14 @@ def _parse_subtitles(
                 raise RuntimeError(f"Unexpected Type {tag} {type(tag)}")
 
         parsed_subs.append(
-            Subtitles(name=clean_latin1_chars(buf), url=convert_to_https_opt(url))
+            Subtitles(
+                name=clean_latin1_chars("".join(buf)), url=convert_to_https_opt(url)
+            )
         )
 
     return parsed_subs, parse_html_dt(dt_raw, file_dt=file_dt)
 
 
-def _split_by_caption_headers(groups: ListOfTags) -> Dict[str, ListOfTags]:
-    """
-    Captions are structured like:
-
-    head1:
-        value1
-    head2:
-        value2
-        value3
-    {
-        "head1": [value1],
-        "head2": [value2, value]
-    }
-    """
-
-    k = ""
-    res: Dict[str, ListOfTags] = {}
-    vals: ListOfTags = []
-
-    for g in groups:
-        possible_key = g[0]
-        # keys look like [<b>Products:</b>]
-        if (
-            isinstance(possible_key, bs4.element.Tag)
-            and possible_key.name == "b"
-            and possible_key.text.endswith(":")
-        ):
-            # if we already have data, add that to the result
-            if k:
-                res[k] = vals
-                vals = []
-            k = possible_key.text.strip()
-        else:
-            # add non-header key to values
-            assert (
-                k
-            ), f"While parsing caption; Found value while key has no value {groups}"
-            vals.append(g)
-
-    # add last key/val pair
-    if vals:
-        res[k] = vals
-
-    return res
-
-
 COMMON_GMAPS_QUERY_PARAMS = set(
     [
         "api",
@@ -157,7 +113,12 @@ COMMON_GMAPS_QUERY_PARAMS = set(
 )
 
 
+# the same few maps URLs show up over and over in an activity file
+@lru_cache(maxsize=4096)
 def _is_location_api_link(url: str) -> bool:
+    if "?" not in url:
+        # no query string, so none of the params can match
+        return False
     query_params = parse_qs(urlparse(url).query)
     query_match_count = [
         param in query_params for param in COMMON_GMAPS_QUERY_PARAMS
@@ -172,85 +133,102 @@ def _parse_caption(
     locationInfos: List[LocationInfo] = []
     products: List[str] = []
 
-    groups = _group_by_brs(list(cap_cell.children))
-
-    split_groups = _split_by_caption_headers(groups)
-
-    for header, values in split_groups.items():
-        for value in values:
-            if header == "Products:":
-                products.append(clean_latin1_chars(str(value[0])).strip())
-            elif header == "Locations:":
-                # man...
-                # so it seems that the name/url
-                # and the source/sourceUrl come in pairs
-                # because of how html works, there can be anywhere
-                # from 2 to 5 elements here, so it seems its best to
-                # convert the entire buffer of elements to text and URLs
-                # and then use some logic to figure out what it is
-
-                # if we have two, we can use the order and split by the hyphen
-                # if we have one, check the url to see if its a specific sort
-                # of google maps URL (e.g. https://www.google.com/maps/search/?api=1&query=...)
-                # and if it is, use it as the name/url pair, else use the text
-                # as the source
-
-                name: Optional[str] = None
-                url: Optional[str] = None
-                source: Optional[str] = None
-                sourceUrl: Optional[str] = None
-
-                textbuf = ""
-                links: List[str] = []
-
-                for tag in value:
-                    if isinstance(tag, bs4.element.NavigableString):
-                        textbuf += str(tag)
-                    elif isinstance(tag, bs4.element.Tag):
-                        textbuf += str(tag.text)
-                        if tag.name == "a" and "href" in tag.attrs:
-                            links.append(tag.attrs["href"])
-
-                textbuf = clean_latin1_chars(textbuf).strip()
-
-                if "-" in textbuf:
-                    f, _, s = textbuf.partition("-")
-                    name = f.strip()
-                    source = s.strip()
-
-                if len(links) == 2:
+    # captions are structured like:
+    #
+    # <b>head1:</b>
+    # value1
+    # <b>head2:</b>
+    # value2
+    # value3
+    #
+    # so keep track of the current header, and parse each value as its reached
+    header = ""
+    for value in _group_by_brs(cap_cell.children):
+        possible_key = value[0]
+        # keys look like [<b>Products:</b>]
+        if (
+            isinstance(possible_key, Tag)
+            and possible_key.name == "b"
+            and possible_key.text.endswith(":")
+        ):
+            header = possible_key.text.strip()
+            continue
+        assert (
+            header
+        ), f"While parsing caption; Found value while key has no value {cap_cell}"
+        if header == "Products:":
+            products.append(clean_latin1_chars(str(value[0])).strip())
+        elif header == "Locations:":
+            # man...
+            # so it seems that the name/url
+            # and the source/sourceUrl come in pairs
+            # because of how html works, there can be anywhere
+            # from 2 to 5 elements here, so it seems its best to
+            # convert the entire buffer of elements to text and URLs
+            # and then use some logic to figure out what it is
+
+            # if we have two, we can use the order and split by the hyphen
+            # if we have one, check the url to see if its a specific sort
+            # of google maps URL (e.g. https://www.google.com/maps/search/?api=1&query=...)
+            # and if it is, use it as the name/url pair, else use the text
+            # as the source
+
+            name: Optional[str] = None
+            url: Optional[str] = None
+            source: Optional[str] = None
+            sourceUrl: Optional[str] = None
+
+            parts: List[str] = []
+            links: List[str] = []
+
+            for tag in value:
+                if isinstance(tag, bs4.element.NavigableString):
+                    parts.append(tag)
+                elif isinstance(tag, bs4.element.Tag):
+                    parts.append(tag.text)
+                    if tag.name == "a" and "href" in tag.attrs:
+                        links.append(tag.attrs["href"])
+
+            textbuf = clean_latin1_chars("".join(parts)).strip()
+
+            if "-" in textbuf:
+                f, _, s = textbuf.partition("-")
+                name = f.strip()
+                source = s.strip()
+
+            if len(links) == 2:
+                url = links[0]
+                sourceUrl = links[1]
+
+            elif len(links) == 1:
+                if _is_location_api_link(links[0]):
                     url = links[0]
-                    sourceUrl = links[1]
-
-                elif len(links) == 1:
-                    if _is_location_api_link(links[0]):
-                        url = links[0]
-                        # wasn't set in partition above, was only one
-                        # phrase of text
-                        if name is None:
-                            name = textbuf
-                    else:
-                        sourceUrl = links[0]
-                        if source is None:
-                            source = textbuf
+                    # wasn't set in partition above, was only one
+                    # phrase of text
+                    if name is None:
+                        name = textbuf
                 else:
-                    # no links, just a description of the source
-                    # (since there's no URL, can't be name)
-                    source = textbuf
-
-                locationInfos.append(
-                    LocationInfo(
-                        name=name,
-                        url=convert_to_https_opt(url),
-                        source=source,
-                        sourceUrl=convert_to_https_opt(sourceUrl),
-                    )
+                    sourceUrl = links[0]
+                    if source is None:
+                        source = textbuf
+            else:
+                # no links, just a description of the source
+                # (since there's no URL, can't be name)
+                source = textbuf
+
+            locationInfos.append(
+                LocationInfo(
+                    name=name,
+                    url=convert_to_https_opt(url),
+                    source=source,
+                    sourceUrl=convert_to_https_opt(sourceUrl),
                 )
-            elif header == "Details:":
-                details.append(str(clean_latin1_chars(str(value[0])).strip()))
+            )
+        elif header == "Details:":
+            details.append(str(clean_latin1_chars(str(value[0])).strip()))
 
-            else:
-                logger.warning(f"Unexpected header in caption {header} {value}")
+        else:
+            logger.warning(f"Unexpected header in caption {header} {value}")
 
     return details, locationInfos, products
 
@@ -332,14 +310,23 @@ def _parse_activity_div(
     )
 
 
+# while parsing, bs4 can match the strainer against the whole class attribute
+# (e.g. 'outer-cell mdl-cell mdl-cell--12-col') instead of each class in it
+_OUTER_CELL_CLASS = re.compile(r"(?:^|\s)outer-cell(?:\s|$)")
+
+
 def _parse_html_activity(p: Path) -> Iterator[Res[Activity]]:
     file_dt = datetime.fromtimestamp(p.stat().st_mtime)
-    data = p.read_text()
-
-    def soup_filter(tag: str, data: Dict[str, Any]) -> bool:
-        return tag == "div" and "outer-cell" in data.get("class", "")
 
-    soup = bs4.BeautifulSoup(data, "lxml", parse_only=bs4.SoupStrainer(soup_filter))  # type: ignore[arg-type]  # this overload is missing from stubs
+    # only build the tree for the activity divs, and let lxml decode the bytes
+    # instead of decoding the whole file into a str first
+    with p.open("rb") as f:
+        soup = bs4.BeautifulSoup(
+            f,
+            "lxml",
+            parse_only=bs4.SoupStrainer("div", class_=_OUTER_CELL_CLASS),
+            from_encoding="utf-8",
+        )
 
     outer_divs: Iterable[bs4.element.Tag] = soup.children  # type: ignore[assignment]  # mypy can't guess they will actually be tags..
     for outer_div in outer_divs:
@@ -27,7 +27,30 @@ COMMENT_DATE_REGEX = re.compile(
 
 
 def _extract_html_li_date(comment: str) -> datetime:
-    matches = re.search(COMMENT_DATE_REGEX, comment)
+    # fast path for the new format, the date is the 19 characters before ' UTC'
+    i = comment.find(" UTC")
+    if i >= 19:
+        d = comment[i - 19 : i]
+        digits = d[0:4] + d[5:7] + d[8:10] + d[11:13] + d[14:16] + d[17:19]
+        if (
+            d[4] == "-"
+            and d[7] == "-"
+            and d[10] == " "
+            and d[13] == ":"
+            and d[16] == ":"
+            and digits.isascii()
+            and digits.isdigit()
+        ):
+            return datetime(
+                int(d[0:4]),
+                int(d[5:7]),
+                int(d[8:10]),
+                int(d[11:13]),
+                int(d[14:16]),
+                int(d[17:19]),
+                tzinfo=timezone.utc,
+            )
+    matches = COMMENT_DATE_REGEX.search(comment)
     if matches:
         g = matches.groups()
         year, month, day, hour, minute, second = tuple(map(int, g))
@@ -40,24 +63,27 @@ def _parse_html_li(li: bs4.element.Tag) -> YoutubeComment:
     parsed_date: datetime = _extract_html_li_date(li.text)
     groups = _group_by_brs(li.children)
     assert len(groups) == 2, f"Expected 2 parts separated by a <br /> {groups}"
-    desc = ""
+    parts: List[str] = []
     for tag in groups[1]:
         if isinstance(tag, bs4.element.NavigableString):
-            desc += str(tag)
+            parts.append(tag)
         elif isinstance(tag, bs4.element.Tag):
-            desc += str(tag.text)
-    urls: List[str] = []
-    for link in li.select("a"):
-        if "href" in link.attrs:
-            urls.append(convert_to_https(link.attrs["href"]))
+            parts.append(tag.text)
+    desc = "".join(parts)
+    urls: List[str] = [
+        convert_to_https(link.attrs["href"]) for link in li.find_all("a", href=True)
+    ]
     return YoutubeComment(
         content=clean_latin1_chars(desc).strip(), urls=urls, dt=parsed_date
     )
 
 
 def _parse_html_comment_file(p: Path) -> Iterator[Res[YoutubeComment]]:
-    soup = bs4.BeautifulSoup(p.read_text(), "lxml")
-    for li in soup.select("li"):
+    with p.open("rb") as f:
+        soup = bs4.BeautifulSoup(
+            f, "lxml", parse_only=bs4.SoupStrainer("li"), from_encoding="utf-8"
+        )
+    for li in soup.find_all("li"):
         try:
             yield _parse_html_li(li)
         except Exception as e:
@@ -76,3 +102,21 @@ def test_parse_html_comment_file() -> None:
         dt=datetime(2020, 4, 27, 23, 18, 23, tzinfo=timezone.utc),
         urls=["https://www.youtube.com/watch?v=mM"],
     )
+
+
+def test_extract_html_li_date() -> None:
+    for comment, expected in [
+        (
+            "Sent at 2020-05-06 19:32:44 UTC while watching a video.",
+            datetime(2020, 5, 6, 19, 32, 44, tzinfo=timezone.utc),
+        ),
+        (
+            "Sent at 2016-06-15T08:50:49Z while watching a video.",
+            datetime(2016, 6, 15, 8, 50, 49, tzinfo=timezone.utc),
+        ),
+        (
+            "on 2020-05-0619:32:44 UTC",
+            datetime(2020, 5, 6, 19, 32, 44, tzinfo=timezone.utc),
+        ),
+    ]:
+        assert _extract_html_li_date(comment) == expected
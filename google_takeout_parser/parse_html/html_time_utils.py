@@ -5,7 +5,7 @@ For backwards compatibility, used to parse HTML datetimes with non-standard time
 
 from typing import Dict, List, Optional
 from functools import lru_cache
-from datetime import datetime
+from datetime import datetime, tzinfo
 
 import pytz
 
@@ -40,22 +40,62 @@ def abbr_to_timezone(abbr: str) -> pytz.BaseTzInfo:
 # Mar 8, 2018, 5:14:40 PM
 _TIME_FORMAT = "%b %d, %Y, %I:%M:%S %p"
 
+_MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+
+def _parse_time(s: str) -> datetime:
+    """
+    Parses _TIME_FORMAT by splitting the string, strptime is pretty slow
+    since it matches a regex and goes through locale handling on every call.
+    Falls back to strptime for anything that doesn't look exactly like the format
+    """
+    try:
+        month_day, year, time_ampm = s.split(", ")
+        month, day = month_day.split(" ")
+        hms, ampm = time_ampm.split(" ")
+        hour, minute, second = hms.split(":")
+        hour_12 = int(hour)
+        if 1 <= hour_12 <= 12 and (ampm == "AM" or ampm == "PM"):
+            return datetime(
+                int(year),
+                _MONTHS[month],
+                int(day),
+                hour_12 % 12 + (12 if ampm == "PM" else 0),
+                int(minute),
+                int(second),
+            )
+    except (ValueError, KeyError):
+        pass
+    return datetime.strptime(s, _TIME_FORMAT)
 
-def parse_html_dt(s: str, *, file_dt: Optional[datetime]) -> datetime:
-    fmt = _TIME_FORMAT
 
+def parse_html_dt(s: str, *, file_dt: Optional[datetime]) -> datetime:
     end = s[-3:]
     if end == " PM" or end == " AM":
         # old takeouts (pre-2018?) didn't have timezone, but seems that it was UTC
-        return pytz.utc.localize(datetime.strptime(s, fmt))
+        # (for UTC, this is the same as pytz.utc.localize, without the extra call)
+        return _parse_time(s).replace(tzinfo=pytz.utc)
 
     s, tzabbr = s.rsplit(maxsplit=1)
-    dt = datetime.strptime(s, fmt)
+    dt = _parse_time(s)
 
     if tzabbr == "UTC":
         # at some point (between 2018-2020?) were explicitly marked as UTC
         # best to just use it and avoid messing with tzinfo
-        return pytz.utc.localize(dt)
+        return dt.replace(tzinfo=pytz.utc)
 
     # however after 2020, for some reason takeouts switched to using local offset at the time of the export
     # e.g. Jan 15, 2021, 6:54:12 PM BST -- British Summer Time doesn't make any sense for a January 15 date
@@ -66,10 +106,27 @@ def parse_html_dt(s: str, *, file_dt: Optional[datetime]) -> datetime:
         # might result in the wrong timestamp... but it's the best we can do
         return tz.localize(dt)
 
+    return tz.normalize(dt.replace(tzinfo=_export_tzinfo(tz, file_dt)))
+
+
+# file_dt is the same for every timestamp in a file, so this
+# only has to localize it once per file/timezone
+@lru_cache(maxsize=1024)
+def _export_tzinfo(tz: pytz.BaseTzInfo, file_dt: datetime) -> tzinfo:
     # this will computer the correct UTC offset
     export_tzinfo = tz.localize(file_dt).tzinfo
     assert export_tzinfo is not None  # make mypy happy
-    return tz.normalize(dt.replace(tzinfo=export_tzinfo))
+    return export_tzinfo
+
+
+def test_parse_time() -> None:
+    for s in [
+        "Mar 8, 2018, 5:14:40 PM",
+        "Dec 31, 2019, 12:00:00 AM",
+        "Jan 1, 2020, 12:59:59 PM",
+        "Jul 04, 2021, 09:05:01 AM",
+    ]:
+        assert _parse_time(s) == datetime.strptime(s, _TIME_FORMAT)
 
 
 def test_parse_dt() -> None:
@@ -3,6 +3,7 @@ Lots of functions to transform the JSON from the Takeout to useful information
 """
 
 import json
+import mmap
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Iterator, Any, Dict, Iterable, Optional, List
@@ -35,26 +36,71 @@ def _read_json_data(p: Path) -> Any:
         )
         return json.loads(p.read_text())
     else:
-        return orjson.loads(p.read_bytes())
+        with p.open("rb") as f:
+            # map the file instead of reading it into a bytes object, so some
+            # of these (which can be hundreds of megabytes) aren't copied in memory
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # e.g. can't map an empty file
+                return orjson.loads(f.read())
+            with mm, memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def _iter_json_list(p: Path, key: str) -> Iterator[Any]:
+    """
+    Yields the items of the list at the top level 'key' of a JSON file,
+    raises a KeyError once done if the key isn't present
+
+    Some of these (e.g. Location History/Records.json) can be hundreds of
+    megabytes, so if ijson is installed this streams the items instead of
+    loading the whole file into memory
+    """
+    try:
+        import ijson
+    except ModuleNotFoundError:
+        json_data = _read_json_data(p)
+        if key not in json_data:
+            raise KeyError(key)
+        yield from json_data[key]
+        return
+
+    with p.open("rb") as f:
+        try:
+            # check the top level key is present first, so a missing key can be
+            # told apart from an empty list without reading the file twice. The
+            # key is usually the first one, so this only reads the first chunk
+            for prefix, event, value in ijson.parse(f):
+                if prefix == "" and event == "map_key" and value == key:
+                    break
+            else:
+                raise KeyError(key)
+            f.seek(0)
+            yield from ijson.items(f, f"{key}.item", use_float=True)
+        except ijson.JSONError as e:
+            # raise the same error as when loading the whole file
+            raise json.JSONDecodeError(f"{p}: {e}", "", 0) from e
 
 
 # "YouTube and YouTube Music/history/search-history.json"
 # "YouTube and YouTube Music/history/watch-history.json"
 # This is also the 'My Activity' JSON format
 def _parse_json_activity(p: Path) -> Iterator[Res[Activity]]:
-    json_data = json.loads(p.read_text())
+    json_data = _read_json_data(p)
     if not isinstance(json_data, list):
         yield RuntimeError(f"Activity: Top level item in '{p}' isn't a list")
     for blob in json_data:
         try:
             subtitles: List[Subtitles] = []
-            for s in blob.get("subtitles", []):
-                if not isinstance(s, dict):
-                    continue
-                # sometimes it's just empty ("My Activity/Assistant" data circa 2018)
-                if "name" not in s:
-                    continue
-                subtitles.append(Subtitles(name=s["name"], url=s.get("url")))
+            if "subtitles" in blob:
+                for s in blob["subtitles"]:
+                    if not isinstance(s, dict):
+                        continue
+                    # sometimes it's just empty ("My Activity/Assistant" data circa 2018)
+                    if "name" not in s:
+                        continue
+                    subtitles.append(Subtitles(name=s["name"], url=s.get("url")))
 
             # till at least 2017
             old_format = "snippet" in blob
@@ -73,27 +119,36 @@ def _parse_json_activity(p: Path) -> Iterator[Res[Activity]]:
                 header = _header
                 time_str = blob["time"]
 
-            yield Activity(
-                header=header,
-                title=blob["title"],
-                titleUrl=convert_to_https_opt(blob.get("titleUrl")),
-                description=blob.get("description"),
-                time=parse_json_utc_date(time_str),
-                subtitles=subtitles,
-                details=[
+            # most items don't have details/locationInfos, so
+            # only build the lists if the keys are present
+            details: List[str] = []
+            if "details" in blob:
+                details = [
                     d["name"]
-                    for d in blob.get("details", [])
+                    for d in blob["details"]
                     if isinstance(d, dict) and "name" in d
-                ],
-                locationInfos=[
+                ]
+            locationInfos: List[LocationInfo] = []
+            if "locationInfos" in blob:
+                locationInfos = [
                     LocationInfo(
                         name=locinfo.get("name"),
                         url=convert_to_https_opt(locinfo.get("url")),
                         source=locinfo.get("source"),
                         sourceUrl=convert_to_https_opt(locinfo.get("sourceUrl")),
                     )
-                    for locinfo in blob.get("locationInfos", [])
-                ],
+                    for locinfo in blob["locationInfos"]
+                ]
+
+            yield Activity(
+                header=header,
+                title=blob["title"],
+                titleUrl=convert_to_https_opt(blob.get("titleUrl")),
+                description=blob.get("description"),
+                time=parse_json_utc_date(time_str),
+                subtitles=subtitles,
+                details=details,
+                locationInfos=locationInfos,
                 products=blob.get("products", []),
             )
         except Exception as e:
@@ -101,7 +156,7 @@ def _parse_json_activity(p: Path) -> Iterator[Res[Activity]]:
 
 
 def _parse_likes(p: Path) -> Iterator[Res[LikedYoutubeVideo]]:
-    json_data = json.loads(p.read_text())
+    json_data = _read_json_data(p)
     if not isinstance(json_data, list):
         yield RuntimeError(f"Likes: Top level item in '{p}' isn't a list")
     for jlike in json_data:
@@ -119,7 +174,7 @@ def _parse_likes(p: Path) -> Iterator[Res[LikedYoutubeVideo]]:
 
 
 def _parse_app_installs(p: Path) -> Iterator[Res[PlayStoreAppInstall]]:
-    json_data = json.loads(p.read_text())
+    json_data = _read_json_data(p)
     if not isinstance(json_data, list):
         yield RuntimeError(f"App installs: Top level item in '{p}' isn't a list")
     for japp in json_data:
@@ -147,24 +202,24 @@ def _parse_timestamp_key(d: Dict[str, Any], key: str) -> datetime:
 def _parse_location_history(p: Path) -> Iterator[Res[Location]]:
     ### HMMM, seems that all the locations are right after one another. broken? May just be all the location history that google has on me
     ### see numpy.diff(list(map(lambda yy: y.at, filter(lambda y: isinstance(Location), events()))))
-    json_data = _read_json_data(p)
-    if "locations" not in json_data:
+    try:
+        for loc in _iter_json_list(p, "locations"):
+            accuracy = loc.get("accuracy")
+            deviceTag = loc.get("deviceTag")
+            source = loc.get("source")
+            try:
+                yield Location(
+                    lng=float(loc["longitudeE7"]) / 1e7,
+                    lat=float(loc["latitudeE7"]) / 1e7,
+                    dt=_parse_timestamp_key(loc, "timestamp"),
+                    accuracy=None if accuracy is None else float(accuracy),
+                    deviceTag=None if deviceTag is None else int(deviceTag),
+                    source=None if source is None else str(source),
+                )
+            except Exception as e:
+                yield e
+    except KeyError:
         yield RuntimeError(f"Locations: no 'locations' key in '{p}'")
-    for loc in json_data.get("locations", []):
-        accuracy = loc.get("accuracy")
-        deviceTag = loc.get("deviceTag")
-        source = loc.get("source")
-        try:
-            yield Location(
-                lng=float(loc["longitudeE7"]) / 1e7,
-                lat=float(loc["latitudeE7"]) / 1e7,
-                dt=_parse_timestamp_key(loc, "timestamp"),
-                accuracy=None if accuracy is None else float(accuracy),
-                deviceTag=None if deviceTag is None else int(deviceTag),
-                source=None if source is None else str(source),
-            )
-        except Exception as e:
-            yield e
 
 
 _sem_required_keys = ["location", "duration"]
@@ -185,7 +240,7 @@ def _check_required_keys(
 
 
 def _parse_semantic_location_history(p: Path) -> Iterator[Res[PlaceVisit]]:
-    json_data = json.loads(p.read_text())
+    json_data = _read_json_data(p)
     if not isinstance(json_data, dict):
         yield RuntimeError(f"Locations: Top level item in '{p}' isn't a dict")
     if "timelineObjects" not in json_data:
@@ -254,19 +309,20 @@ def _parse_semantic_location_history(p: Path) -> Iterator[Res[PlaceVisit]]:
 
 
 def _parse_chrome_history(p: Path) -> Iterator[Res[ChromeHistory]]:
-    json_data = json.loads(p.read_text())
-    if "Browser History" not in json_data:
+    try:
+        for item in _iter_json_list(p, "Browser History"):
+            try:
+                yield ChromeHistory(
+                    title=item["title"],
+                    # dont convert to https here, this is just the users history
+                    # and there's likely lots of items that aren't https
+                    url=item["url"],
+                    dt=datetime.fromtimestamp(
+                        item["time_usec"] / 10**6, tz=timezone.utc
+                    ),
+                    pageTransition=item.get("page_transition")
+                )
+            except Exception as e:
+                yield e
+    except KeyError:
         yield RuntimeError(f"Chrome/BrowserHistory: no 'Browser History' key in '{p}'")
-    for item in json_data.get("Browser History", []):
-        try:
-            time_naive = datetime.utcfromtimestamp(item["time_usec"] / 10**6)
-            yield ChromeHistory(
-                title=item["title"],
-                # dont convert to https here, this is just the users history
-                # and there's likely lots of items that aren't https
-                url=item["url"],
-                dt=time_naive.replace(tzinfo=timezone.utc),
-                pageTransition=item.get("page_transition")
-            )
-        except Exception as e:
-            yield e
@@ -4,31 +4,39 @@ This file loads and parses files according to a localized HandlerMap
 
 import os
 import re
+import pickle
 from pathlib import Path
 from typing import (
     Sequence,
-    Iterable,
     Iterator,
     Dict,
     Callable,
     Any,
     Optional,
-    Pattern,
     List,
     Type,
     Tuple,
     Union,
     Literal,
+    Deque,
 )
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from functools import lru_cache
 
 from cachew import cachew
 
-from . import __version__ as _google_takeout_version
-from .common import Res, PathIsh
+from .common import Res, PathIsh, workers_from_env
 
-from .locales.common import BaseResults, HandlerFunction, HandlerMap
+from .locales.common import (
+    BaseResults,
+    HandlerFunction,
+    HandlerMap,
+    CompiledHandlerMap,
+    compile_handler_map,
+)
 from .locales.main import LOCALES, get_paths_for_functions
 
 
@@ -52,6 +60,8 @@ def _cache_key_to_str(c: CacheKey) -> str:
     return "_".join(sorted(p.__name__ for p in c)).casefold()
 
 
+# this is called for every file in the dispatch map, but there are only a few handlers
+@lru_cache(maxsize=None)
 def _handler_type_cache_key(handler: HandlerFunction) -> CacheKey:
     # Take a function like Iterator[Union[Item, Exception]] and return Item
 
@@ -133,6 +143,57 @@ def _handler_map_to_list(
     return handlers
 
 
+def _walk_takeout(
+    takeout_dir: Path,
+) -> Iterator[Tuple[Path, List[str], List[str]]]:
+    """
+    Walk the takeout directory, yielding (root, dirs, files) like os.walk
+
+    we use walk rather than .glob/.rglob to avoid instantiating too many Path objects
+    many of them will get rejected by the regexes in handlers anyway
+    """
+    if hasattr(takeout_dir, "walk"):
+        # this codepath is used from python 3.12 that has Path.walk
+        # , or other implementations that support it (e.g. zipfile wrappers)
+        yield from takeout_dir.walk()
+    else:
+        for root, dirs, files in os.walk(takeout_dir):
+            yield Path(root), dirs, files
+
+
+def _iter_relative_paths(
+    takeout_dir: Path, ignores_dir: Callable[[str], bool]
+) -> Iterator[str]:
+    """
+    Yields the paths of files in the takeout, relative to the takeout directory
+
+    ignores_dir receives directories (relative to the takeout), if it returns True
+    the walk doesn't descend into that directory
+    """
+    for root, dirs, files in _walk_takeout(takeout_dir):
+        dirs.sort()
+        files.sort()
+
+        # compute relative path of parent dir once, this saves a lot of time when takeout has tens of thousands of files
+        root_relative = str(root.relative_to(takeout_dir))
+
+        # modifying dirs in place prunes the walk
+        dirs[:] = [
+            d
+            for d in dirs
+            if not ignores_dir(
+                d if root_relative == "." else os.path.join(root_relative, d)
+            )
+        ]
+        for f in files:
+            if f[0] == ".":
+                continue
+            if root_relative == ".":
+                yield f
+            else:
+                yield os.path.join(root_relative, f)
+
+
 class TakeoutParser:
     def __init__(
         self,
@@ -173,6 +234,7 @@ class TakeoutParser:
 
         self.error_policy: ErrorPolicy = error_policy
         self.warn_exceptions = warn_exceptions
+        self.parse_workers = workers_from_env("GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS")
         self.handlers = self._resolve_locale_handler_map(
             takeout_dir=self.takeout_dir,
             locale_name=locale_name,
@@ -219,16 +281,25 @@ class TakeoutParser:
         logger.debug(
             "No locale specified, guessing based on how many filepaths match from each locale"
         )
-        locale_scores: Dict[str, int] = {
-            locale_name: len(
-                cls._dispatch_map_pure(
-                    takeout_dir=takeout_dir,
-                    handler_maps=[locale_map],
-                    warn_exceptions=False,  # dont warn here, we expect a bunch of path misses
-                )
-            )
+        # walk the takeout once, and score each locale by how many files it would parse
+        compiled_locales = {
+            locale_name: compile_handler_map(locale_map)
             for locale_name, locale_map in LOCALES.items()
         }
+        locale_scores: Dict[str, int] = dict.fromkeys(compiled_locales, 0)
+        for rf in _iter_relative_paths(
+            takeout_dir,
+            # only skip directories which every locale would ignore
+            lambda d: all(
+                cls._ignores_dir(d, [compiled])
+                for compiled in compiled_locales.values()
+            ),
+        ):
+            for locale_name, compiled in compiled_locales.items():
+                # misses are expected here, so they're not warned about
+                file_handler = cls._match_handler(rf, compiled)
+                if file_handler is not None and not isinstance(file_handler, Exception):
+                    locale_scores[locale_name] += 1
 
         logger.debug(f"Locale scores: {locale_scores}")
 
@@ -248,36 +319,54 @@ class TakeoutParser:
 
         logger.debug(f"Trying to match one of: {expect_one_of}")
 
-        path_names = [p.name for p in self.takeout_dir.iterdir()]
-
-        for activity_dir in expect_one_of:
-            # match regex path
-            for p in path_names:
-                if re.match(activity_dir, str(p)):
-                    logger.debug(f"Matched expected directory: {activity_dir}")
-                    return
+        # join the regexes into one alternation, so each name is only matched once
+        # the first alternative which matches is reported, like checking them in order
+        expected = re.compile(
+            "|".join(f"(?P<_d{i}>{d})" for i, d in enumerate(expect_one_of))
+        )
+        matched = [
+            m.lastgroup
+            for m in map(expected.match, (p.name for p in self.takeout_dir.iterdir()))
+            if m is not None and m.lastgroup is not None
+        ]
+        if matched:
+            activity_dir = expect_one_of[min(int(g[2:]) for g in matched)]
+            logger.debug(f"Matched expected directory: {activity_dir}")
+            return
 
         logger.warning(
             f"Warning: given '{self.takeout_dir}', expected one of '{expect_one_of}' to exist, perhaps you passed the wrong location?"
         )
 
     @staticmethod
-    def _match_handler(relative_path: str, handler: Iterable[Tuple[Pattern[str], Optional[HandlerFunction]]]) -> HandlerMatch:
+    def _match_handler(
+        relative_path: str, handler: CompiledHandlerMap
+    ) -> HandlerMatch:
         """
-        Match one of the handler regexes to a function which parses the file
+        Match one of the handler patterns to a function which parses the file
         """
         # replace OS-specific (e.g. windows) path separator to match the handler
         sf = relative_path.replace(os.sep, "/")
-        for prefix_re, h in handler:
-            # regex match the map (e.g. above)
-            if prefix_re.match(sf) is not None:
-                # could be None, if chosen to ignore
-                if h is None:
-                    return None
-                elif callable(h):
-                    return h
-        else:
+        index = handler.match(sf)
+        if index is None:
             return RuntimeError(f"No function to handle parsing {sf}")
+        # could be None, if chosen to ignore
+        return handler.handlers[index]
+
+    @staticmethod
+    def _ignores_dir(
+        relative_dir: str, handlers: List[CompiledHandlerMap]
+    ) -> bool:
+        """
+        Whether every file in this directory would be ignored by the handlers
+        """
+        sd = relative_dir.replace(os.sep, "/")
+        for handler in handlers:
+            ignored = handler.ignores_dir(sd)
+            # if this handler map can't match anything here, the next one is tried
+            if ignored is not None:
+                return ignored
+        return False
 
     def dispatch_map(self) -> Dict[Path, HandlerFunction]:
         return self._dispatch_map_pure(
@@ -298,40 +387,18 @@ class TakeoutParser:
         A pure function for dispatch map so it can be used in other contexts (e.g. to detect locales by scanning the directory)
         """
 
-        # precompile regexes to avoid compiling every time we try to match a file
+        # precompile patterns to avoid compiling every time we try to match a file
         # normally re.match caches them, but it's an lru cache, so we overwhelm it with so many handlers/locales
         compiled_handlers = [
-            [(re.compile(prefix), handler) for prefix, handler in handler_map.items()]
-            for handler_map in handler_maps
+            compile_handler_map(handler_map) for handler_map in handler_maps
         ]
 
-        def iter_relative_paths() -> Iterator[str]:
-            # we use walk rather than .glob to avoid instantiating too many Path objects
-            # many of them will get rejected by the regexes in handlers anyway
-
-            takeout_dir_walk: Callable[..., Iterator[Tuple[Path, List[str], List[str]]]]
-            if hasattr(takeout_dir, 'walk'):
-                # this codepath is used from python 3.12 that has Path.walk
-                # , or other implementations that support it (e.g. zipfile wrappers)
-                takeout_dir_walk = takeout_dir.walk
-            else:
-                def takeout_dir_walk() -> Iterator[Tuple[Path, List[str], List[str]]]:
-                    for root, dirs, files in os.walk(takeout_dir):
-                        yield Path(root), dirs, files
-
-            for root, dirs, files in takeout_dir_walk():
-                dirs.sort()
-                files.sort()
-
-                # compute relative path of parent dir once, this saves a lot of time when takeout has tens of thousands of files
-                root_relative = root.relative_to(takeout_dir)
-                for f in files:
-                    if f[0] == '.':
-                        continue
-                    yield os.path.join(root_relative, f)
-
         res: Dict[Path, HandlerFunction] = {}
-        for rf in iter_relative_paths():
+        # don't descend into directories where every file would be ignored
+        # (e.g. 'Google Photos/')
+        for rf in _iter_relative_paths(
+            takeout_dir, lambda d: cls._ignores_dir(d, compiled_handlers)
+        ):
             # try to resolve file to parser-function by checking all supplied handlers
 
             # cache handler information for warning if we can't resolve the file
@@ -360,19 +427,67 @@ class TakeoutParser:
 
         return res
 
-    def _log_handler(self, path: Path, handler: Any) -> None:
-        """Log the path/function parsing it"""
+    def _handler_message(self, path: Path, handler: Any) -> str:
         rel_path = str(path)[len(str(self.takeout_dir)) + 1 :]
         func_name: str = getattr(handler, "__name__", str(handler))
-        logger.info(f"Parsing '{rel_path}' using '{func_name}'")
+        return f"Parsing '{rel_path}' using '{func_name}'"
+
+    def _log_handler(self, path: Path, handler: Any) -> None:
+        """Log the path/function parsing it"""
+        logger.info(self._handler_message(path, handler))
 
     def _parse_raw(self, filter_type: FilterType = None) -> BaseResults:
         """Parse the takeout with no cache. If a filter is specified, only parses those files"""
         handlers = self._group_by_return_type(filter_type=filter_type)
         for _, result_tuples in handlers.items():
-            for path, itr in result_tuples:
-                self._log_handler(path, itr)
-                yield from itr
+            yield from self._parse_files(result_tuples)
+
+    def _parse_files(self, files: List[Tuple[Path, HandlerFunction]]) -> BaseResults:
+        """
+        Run each handler on its file, in order
+
+        Set GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS to a number of processes to
+        parse the files in parallel
+        """
+        workers = self.parse_workers
+        if workers > 1 and len(files) > 1:
+            # handlers are sent to the workers by reference, so
+            # e.g. nested functions/lambdas can only be run here
+            unpicklable = [h for h in {h for _, h in files} if not _is_picklable(h)]
+            if unpicklable:
+                logger.debug(
+                    f"Can't send {unpicklable} to worker processes, parsing serially"
+                )
+            else:
+                yield from self._parse_files_pool(files, workers)
+                return
+        for path, handler in files:
+            self._log_handler(path, handler)
+            yield from handler(path)
+
+    def _parse_files_pool(
+        self, files: List[Tuple[Path, HandlerFunction]], workers: int
+    ) -> BaseResults:
+        # each worker returns a list of results for one file. only keep a
+        # few files in flight, so at most that many lists are held in memory
+        # while the results are consumed, in the same order as the files
+        todo = iter(files)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+
+            def _submit(
+                item: Tuple[Path, HandlerFunction]
+            ) -> "Future[List[Res[BaseEvent]]]":
+                path, handler = item
+                msg = self._handler_message(path, handler)
+                return ex.submit(_parse_file, path, handler, msg)
+
+            pending: Deque["Future[List[Res[BaseEvent]]]"] = deque(
+                map(_submit, islice(todo, workers + 1))
+            )
+            while pending:
+                res = pending.popleft().result()
+                pending.extend(map(_submit, islice(todo, 1)))
+                yield from res
 
     def _handle_errors(self, results: BaseResults) -> BaseResults:
         """Wrap the results and handle any errors according to the policy"""
@@ -406,7 +521,7 @@ class TakeoutParser:
 
     def _group_by_return_type(
         self, filter_type: FilterType = None
-    ) -> Dict[CacheKey, List[Tuple[Path, BaseResults]]]:
+    ) -> Dict[CacheKey, List[Tuple[Path, HandlerFunction]]]:
         """
         Groups the dispatch_map by output model type
         If filter_type is provided, only returns that Model
@@ -414,12 +529,14 @@ class TakeoutParser:
         e.g.:
 
         Activity -> [
-            (filepath, iterator that produces activity)
-            (filepath, iterator that produces activity),
-            (filepath, iterator that produces activity),
+            (filepath, function that produces activity)
+            (filepath, function that produces activity),
+            (filepath, function that produces activity),
         ]
         """
-        handlers: Dict[CacheKey, List[Tuple[Path, BaseResults]]] = defaultdict(list)
+        handlers: Dict[CacheKey, List[Tuple[Path, HandlerFunction]]] = defaultdict(
+            list
+        )
         ftype: List[Type[BaseEvent]] = []
         if filter_type is not None:
             if isinstance(filter_type, Sequence):
@@ -434,21 +551,31 @@ class TakeoutParser:
                     f"Provided '{ftype}' as filter, '{ckey}' doesn't match, ignoring '{path}'..."
                 )
                 continue
-            # call the function -- since the parsers are all generators,
-            # this doesn't run here, it just waits till its consumed
-            handlers[ckey].append((path, handler(path)))
+            # the function is called when the results are consumed,
+            # see _parse_files
+            handlers[ckey].append((path, handler))
         return dict(handlers)
 
-    def _depends_on(self) -> str:
+    def _depends_on(self, paths: Sequence[Path]) -> str:
         """
-        basename of all files in the takeout directory + google_takeout_version version
+        relative path, size and modification time of each file parsed into this cache + google_takeout_version version
+
+        only includes the files for this cache, so e.g. adding or changing files
+        elsewhere in the takeout doesn't invalidate it
         """
-        file_index: List[str] = list(
-            sorted([str(p.name) for p in self.takeout_dir.rglob("*")])
-        )
+        # imported here, resolving the version is deferred until a cache is used
+        from . import __version__ as google_takeout_version
+
+        file_index: List[str] = []
+        for path in paths:
+            st = path.stat()
+            file_index.append(
+                f"{path.relative_to(self.takeout_dir)}:{st.st_size}:{st.st_mtime_ns}"
+            )
+        file_index.sort()
         # store version at the beginning of hash
         # if pip version changes, invalidates old results and re-computes
-        file_index.insert(0, f"google_takeout_version: {_google_takeout_version}")
+        file_index.insert(0, f"google_takeout_version: {google_takeout_version}")
         return str(file_index)
 
     def _determine_cache_path(self, cache_key: CacheKey) -> str:
@@ -470,15 +597,31 @@ class TakeoutParser:
             _ret_type: Any = _cache_key_to_type(cache_key)
 
             def _func() -> Iterator[Res[_ret_type]]:  # type: ignore[valid-type]
-                for path, itr in result_tuples:
-                    self._log_handler(path, itr)
-                    yield from itr
+                yield from self._parse_files(result_tuples)
 
             cached_itr: Callable[[], BaseResults] = cachew(
-                depends_on=lambda: self._depends_on(),
+                depends_on=lambda: self._depends_on(
+                    [path for path, _ in result_tuples]
+                ),
                 cache_path=lambda: self._determine_cache_path(cache_key),
                 force_file=True,
                 logger=logger,
             )(_func)
 
             yield from cached_itr()
+
+
+def _parse_file(
+    path: Path, handler: HandlerFunction, message: str
+) -> List[Res[BaseEvent]]:
+    """Runs in a worker process, see TakeoutParser._parse_files_pool"""
+    logger.info(message)
+    return list(handler(path))
+
+
+def _is_picklable(obj: Any) -> bool:
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
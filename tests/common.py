@@ -1,4 +1,32 @@
+import json
 from pathlib import Path
+from typing import Sequence
 
 this_dir = Path(__file__).parent
 testdata = this_dir / "testdata"
+
+
+def chrome_takeout(
+    takeout_dir: Path,
+    start: int = 0,
+    count: int = 5,
+    files: Sequence[str] = ("BrowserHistory.json",),
+) -> Path:
+    """
+    Create a small takeout with Chrome history files, each one containing
+    the items numbered start to start + count
+    """
+    chrome = takeout_dir / "Chrome"
+    chrome.mkdir(parents=True)
+    items = [
+        {
+            "page_transition": "LINK",
+            "title": f"page {n}",
+            "url": f"https://example.com/{n}",
+            "time_usec": (1600000000 + n) * 10**6,
+        }
+        for n in range(start, start + count)
+    ]
+    for name in files:
+        (chrome / name).write_text(json.dumps({"Browser History": items}))
+    return takeout_dir
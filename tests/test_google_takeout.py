@@ -1,7 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from google_takeout_parser.common import Res
+from google_takeout_parser.models import ChromeHistory
+from google_takeout_parser.parse_json import _parse_chrome_history
 from google_takeout_parser.path_dispatch import TakeoutParser
+from google_takeout_parser.locales.common import HandlerMap
 from google_takeout_parser.locales.main import LOCALES
 
-from .common import testdata
+from .common import chrome_takeout, testdata
 
 
 def test_structure() -> None:
@@ -26,3 +37,51 @@ def test_structure_ger() -> None:
     assert len(m) == 19
 
     assert tk._guess_locale(takeout_dir=tk.takeout_dir) == [LOCALES["DE"]]
+
+
+# two files with the same handler, so they can be parsed in parallel
+_CHROME_FILES = ("BrowserHistory.json", "History.json")
+
+
+def test_parse_workers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    takeout = chrome_takeout(tmp_path, count=3, files=_CHROME_FILES)
+    serial = list(TakeoutParser(takeout, locale_name="EN").parse())
+    assert len(serial) == 6
+    monkeypatch.setenv("GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS", "2")
+    assert list(TakeoutParser(takeout, locale_name="EN").parse()) == serial
+
+
+def test_parse_workers_invalid(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    takeout = chrome_takeout(tmp_path, count=3, files=_CHROME_FILES)
+    monkeypatch.setenv("GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS", "four")
+    with pytest.raises(ValueError, match="GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS"):
+        TakeoutParser(takeout, locale_name="EN")
+
+
+def test_parse_workers_unpicklable_handler(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    takeout = chrome_takeout(tmp_path, count=3, files=_CHROME_FILES)
+
+    # a local function can't be sent to another process, so this parses serially
+    def _local_chrome_history(p: Path) -> Iterator[Res[ChromeHistory]]:
+        yield from _parse_chrome_history(p)
+
+    handlers: HandlerMap = {r"Chrome/.*\.json": _local_chrome_history}
+    serial = list(TakeoutParser(takeout, handlers=handlers).parse())
+    assert len(serial) == 6
+    monkeypatch.setenv("GOOGLE_TAKEOUT_PARSER_PARSE_WORKERS", "2")
+    assert list(TakeoutParser(takeout, handlers=handlers).parse()) == serial
+
+
+def test_version_resolved_lazily() -> None:
+    # run in a new interpreter, other tests may have already resolved it
+    code = (
+        "import google_takeout_parser as g, google_takeout_parser.path_dispatch\n"
+        "assert g._version.cache_info().misses == 0\n"
+        "assert g.__version__ == g.__version__\n"
+        "assert g._version.cache_info().misses == 1\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
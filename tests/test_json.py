@@ -1,3 +1,4 @@
+import sys
 import json
 import datetime
 from pathlib import Path
@@ -176,6 +177,38 @@ def test_chrome_history(tmp_path_f: Path) -> None:
     ]
 
 
+def test_location_missing_key(tmp_path_f: Path) -> None:
+    fp = tmp_path_f / "file"
+    fp.write_text('{"other": []}')
+    res = list(prj._parse_location_history(fp))
+    assert len(res) == 1
+    assert isinstance(res[0], RuntimeError)
+
+    fp.write_text('{"locations": []}')
+    assert list(prj._parse_location_history(fp)) == []
+
+
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_iter_json_list_invalid(
+    tmp_path_f: Path, use_ijson: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if use_ijson:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setitem(sys.modules, "ijson", None)
+    fp = tmp_path_f / "file"
+    # empty and truncated files raise the same error with or without ijson
+    for contents in ("", '{"locations": [{"latitudeE7": 1'):
+        fp.write_text(contents)
+        with pytest.raises(json.JSONDecodeError):
+            list(prj._iter_json_list(fp, "locations"))
+
+    fp.write_text('{"locations": [1, 2.5]}')
+    assert list(prj._iter_json_list(fp, "locations")) == [1, 2.5]
+    with pytest.raises(KeyError):
+        list(prj._iter_json_list(fp, "other"))
+
+
 def test_semantic_location_history(tmp_path_f: Path) -> None:
     data = {
         "timelineObjects": [
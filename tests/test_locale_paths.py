@@ -12,3 +12,84 @@ def test_locale_paths() -> None:
         "YouTube( and YouTube Music)?",
         "YouTube( und YouTube Music)?",
     ]
+
+
+def test_compiled_handler_map_order() -> None:
+    from google_takeout_parser.locales.common import CompiledHandlerMap
+    from google_takeout_parser.locales.en import HANDLER_MAP
+    from google_takeout_parser.parse_json import _parse_chrome_history
+
+    compiled = CompiledHandlerMap(HANDLER_MAP)
+
+    def _handler(path: str) -> object:
+        index = compiled.match(path)
+        assert index is not None, path
+        return compiled.handlers[index]
+
+    # regex pattern listed before the literal 'Chrome' prefix still wins
+    assert _handler("Chrome/BrowserHistory.json") is _parse_chrome_history
+    assert _handler("Chrome/Autofill.json") is None
+    # literal patterns are prefixes, like re.match
+    assert _handler("Chromebook/something") is None
+    assert _handler("Google Photos/2020/img.jpg") is None
+    assert compiled.match("Google Photos") is None
+    assert compiled.match("Something Else/file.json") is None
+
+
+def test_compile_handler_map_reused() -> None:
+    from google_takeout_parser.locales.common import compile_handler_map
+    from google_takeout_parser.locales.en import HANDLER_MAP
+
+    compiled = compile_handler_map(HANDLER_MAP)
+    assert compile_handler_map(dict(HANDLER_MAP)) is compiled
+    assert compile_handler_map({**HANDLER_MAP, "Extra/": None}) is not compiled
+
+
+def test_compiled_handler_map_combined_regex() -> None:
+    from google_takeout_parser.locales.common import CompiledHandlerMap
+
+    compiled = CompiledHandlerMap(
+        {r"A/.*\.json": None, r"A/": None, r"(B|C)/.*\.html": None}
+    )
+    # the regexes are attached to the node for their literal head
+    assert compiled.root.combined is not None
+    assert compiled.root.children["A"].combined is not None
+    assert compiled.match("A/x.json") == 0
+    assert compiled.match("A/x.html") == 1
+    assert compiled.match("C/y.html") == 2
+    assert compiled.match("D/y.html") is None
+
+    # can't be joined into one regex, falls back to trying them in order
+    compiled = CompiledHandlerMap({r"(?P<dir>B)/.*\.html": None, r"A/.*": None})
+    assert compiled.root.combined is None
+    assert compiled.match("A/x.json") == 1
+    assert compiled.match("B/y.html") == 0
+
+
+def test_compiled_handler_map_ignores_dir() -> None:
+    from google_takeout_parser.locales.common import compile_handler_map
+    from google_takeout_parser.locales.en import HANDLER_MAP
+
+    compiled = compile_handler_map(HANDLER_MAP)
+    assert compiled.ignores_dir("Google Photos") is True
+    assert compiled.ignores_dir("Google Photos/Album") is True
+    # has files which are parsed
+    assert compiled.ignores_dir("Chrome") is False
+    assert compiled.ignores_dir("My Activity") is False
+    # nothing here matches, so these are warned about instead
+    assert compiled.ignores_dir("Something Else") is None
+
+
+def test_literal_head_escapes() -> None:
+    from google_takeout_parser.locales.common import _literal_head, compile_handler_map
+    from google_takeout_parser.locales.en import HANDLER_MAP
+
+    assert _literal_head(r"Chrome/History\.json") == ("Chrome/History.json", True)
+    assert _literal_head(r"Maps \(your places\)") == ("Maps (your places)", True)
+    assert _literal_head(r"Saved/.*\.csv") == ("Saved/", False)
+    assert _literal_head(r"live\s*chats") == ("live", False)
+
+    compiled = compile_handler_map(HANDLER_MAP)
+    index = compiled.match("Maps (your places)/Saved Places.json")
+    assert index is not None and compiled.handlers[index] is None
+    assert compiled.match("Chrome/HistoryXjson") == compiled.match("Chrome/x")
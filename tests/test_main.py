@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import sys
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from google_takeout_parser.__main__ import (
+    _emit_json,
+    _extract_takeout,
+    _json_dumps_func,
+)
+from google_takeout_parser.models import Activity, Location, Subtitles
+
+
+def test_json_dumps_matches_stdlib(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("orjson")
+    events = [
+        Activity(
+            header="YouTube",
+            title="Watched a vidéo — ok",
+            time=datetime(2021, 1, 2, 3, 4, 5, 6000, tzinfo=timezone.utc),
+            description=None,
+            titleUrl="https://www.youtube.com/watch?v=a",
+            subtitles=[Subtitles(name="channel", url=None)],
+            details=[],
+            locationInfos=[],
+            products=["YouTube"],
+        ),
+        Location(
+            lat=35.1324213,
+            lng=-112.2434441,
+            accuracy=10.5,
+            deviceTag=-8024144696862913506,
+            source="WIFI",
+            dt=datetime(2017, 12, 10, 23, 14, 58, tzinfo=timezone.utc),
+        ),
+        ValueError("bad data"),
+    ]
+    orjson_dumps = _json_dumps_func()
+    # make 'import orjson' fail, to use the stdlib fallback
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    stdlib_dumps = _json_dumps_func()
+    assert orjson_dumps is not stdlib_dumps
+    for e in events:
+        assert orjson_dumps(e) == stdlib_dumps(e)
+
+
+def test_emit_json_non_utf8_stdout(monkeypatch: pytest.MonkeyPatch) -> None:
+    # e.g. output redirected to a file on Windows
+    buf = io.BytesIO()
+    stdout = io.TextIOWrapper(buf, encoding="cp1252")
+    monkeypatch.setattr(sys, "stdout", stdout)
+    _emit_json([{"title": "日本"}, {"title": "ok"}])
+    assert buf.getvalue() == '[{"title":"日本"},{"title":"ok"}]\n'.encode("utf-8")
+    assert json.loads(buf.getvalue()) == [{"title": "日本"}, {"title": "ok"}]
+
+
+def test_extract_takeout(tmp_path: Path) -> None:
+    zp = tmp_path / "takeout.zip"
+    with zipfile.ZipFile(zp, "w") as zf:
+        zf.writestr("Takeout/archive_browser.html", "<html></html>")
+        zf.writestr("Takeout/Chrome/History.json", "{}")
+        zf.writestr("Takeout/../escape.json", "{}")
+    target = tmp_path / "out" / "Takeout-1"
+    _extract_takeout(str(zp), str(target))
+    assert (target / "Chrome" / "History.json").read_text() == "{}"
+    # '..' is stripped by zipfile, instead of escaping the target
+    assert (target / "escape.json").exists()
+    assert os.listdir(target.parent) == ["Takeout-1"]
+    # same permissions as a directory created normally, not the 0700 of a tempdir
+    (tmp_path / "plain").mkdir()
+    assert target.stat().st_mode == (tmp_path / "plain").stat().st_mode
+
+
+def test_extract_takeout_failure(tmp_path: Path) -> None:
+    zp = tmp_path / "takeout.zip"
+    with zipfile.ZipFile(zp, "w") as zf:
+        zf.writestr("Takeout/archive_browser.html", "<html></html>")
+        zf.writestr("Takeout/Chrome/History.json", "original contents")
+    # corrupt the (uncompressed) data of the second member, so its CRC check fails
+    zp.write_bytes(zp.read_bytes().replace(b"original", b"modified"))
+    target = tmp_path / "out" / "Takeout-1"
+    with pytest.raises(zipfile.BadZipFile):
+        _extract_takeout(str(zp), str(target))
+    # the partially extracted directory is removed, target never created
+    assert os.listdir(target.parent) == []
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from google_takeout_parser import path_dispatch
+from google_takeout_parser.common import PathIsh
+from google_takeout_parser.merge import (
+    GoogleEventSet,
+    merge_events,
+    _merge_takeouts,
+)
+from google_takeout_parser.models import (
+    CacheResults,
+    ChromeHistory,
+    LikedYoutubeVideo,
+)
+
+from .common import chrome_takeout
+
+
+def _history(n: int) -> ChromeHistory:
+    return ChromeHistory(
+        title=f"page {n}",
+        url=f"https://example.com/{n}",
+        dt=datetime.fromtimestamp(1600000000 + n, tz=timezone.utc),
+        pageTransition="LINK",
+    )
+
+
+def test_merge_events_dedup() -> None:
+    a = [_history(i) for i in range(5)]
+    b = [_history(i) for i in range(3, 8)]
+    merged = list(merge_events(iter(a), iter(b)))
+    assert merged == [_history(i) for i in range(8)]
+
+
+def test_merge_events_yields_before_error() -> None:
+    def _source() -> Iterator[ChromeHistory]:
+        for i in range(5):
+            yield _history(i)
+        raise RuntimeError("failed while parsing")
+
+    received = []
+    src: CacheResults = _source()
+    with pytest.raises(RuntimeError):
+        for e in merge_events(src):
+            received.append(e)
+    assert received == [_history(i) for i in range(5)]
+
+
+def test_merge_workers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(path_dispatch, "takeout_cache_path", tmp_path / "cache")
+    paths: List[PathIsh] = [
+        chrome_takeout(tmp_path / "Takeout-1", 0),
+        chrome_takeout(tmp_path / "Takeout-2", 3),
+    ]
+    serial = list(_merge_takeouts(paths, "EN"))
+    assert serial == [_history(i) for i in range(8)]
+    monkeypatch.setenv("GOOGLE_TAKEOUT_PARSER_MERGE_WORKERS", "2")
+    assert list(_merge_takeouts(paths, "EN")) == serial
+    monkeypatch.setenv("GOOGLE_TAKEOUT_PARSER_MERGE_WORKERS", "two")
+    with pytest.raises(ValueError, match="GOOGLE_TAKEOUT_PARSER_MERGE_WORKERS"):
+        list(_merge_takeouts(paths, "EN"))
+
+
+def test_event_set_no_hash_collisions() -> None:
+    # hash(-1) == hash(-2), so keeping only the hash of the keys would drop one of these
+    assert hash((LikedYoutubeVideo, -1)) == hash((LikedYoutubeVideo, -2))
+    videos = [
+        LikedYoutubeVideo(
+            title="video",
+            desc="",
+            link="https://youtube.com/watch?v=a",
+            dt=datetime.fromtimestamp(ts, tz=timezone.utc),
+        )
+        for ts in (-1, -2)
+    ]
+    assert videos[0].key != videos[1].key
+    s = GoogleEventSet()
+    assert s.add_if_not_present(videos[0])
+    assert s.add_if_not_present(videos[1])
+    assert not s.add_if_not_present(videos[0])
+    assert len(s) == 2
+    assert list(merge_events(iter(videos))) == videos
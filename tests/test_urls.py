@@ -42,3 +42,45 @@ def test_convert_to_https(caplog: LogCaptureFixture) -> None:
         "HTTP URL did not match allowlist: http://www.otherurl.com\nIf you think this should be auto-converted to HTTPS, make an issue here:"
         in caplog.records[0].message
     )
+
+
+def test_convert_to_https_cached() -> None:
+    from google_takeout_parser.http_allowlist import (
+        convert_to_https,
+        convert_to_https_opt,
+        _convert_to_https_cached,
+    )
+
+    _convert_to_https_cached.cache_clear()
+    url = "http://m.youtube.com/watch?v=456"
+    assert convert_to_https(url) == "https://m.youtube.com/watch?v=456"
+    assert convert_to_https_opt(url) == "https://m.youtube.com/watch?v=456"
+    assert convert_to_https_opt(None) is None
+    assert _convert_to_https_cached.cache_info().hits == 1
+
+
+def test_convert_to_https_cached_logs(
+    caplog: LogCaptureFixture
+) -> None:
+    from google_takeout_parser.log import logger
+    from google_takeout_parser.http_allowlist import (
+        convert_to_https,
+        _convert_to_https_cached,
+    )
+
+    _convert_to_https_cached.cache_clear()
+    url = "http://www.otherurl.com/cached"
+    # the package logger doesn't propagate, attach the capture handler to it
+    # (addHandler is a no-op if pytest already attached it)
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        logger.addHandler(caplog.handler)
+        try:
+            assert convert_to_https(url) == url
+            assert convert_to_https(url) == url
+        finally:
+            logger.removeHandler(caplog.handler)
+
+    # logged on every call, even when the conversion is a cache hit
+    assert _convert_to_https_cached.cache_info().hits == 1
+    assert len(caplog.records) == 2
+    assert all(url in r.message for r in caplog.records)